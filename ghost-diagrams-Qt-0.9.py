@@ -65,7 +65,7 @@
   TODO: (blue sky) 3D, third dimension == time
 """
 
-import sys, os, random, math, functools, collections, optparse
+import sys, os, random, math, functools, collections, itertools, bisect, heapq, re, time, optparse
 import PyQt5.QtCore as QtCore
 import PyQt5.QtGui as QtGui
 import PyQt5.QtWidgets as QtWidgets
@@ -232,6 +232,8 @@ catalogue = [
 # =========================================================================
 
 class Point:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x,y):
         self.x = x
         self.y = y
@@ -239,7 +241,7 @@ class Point:
     def __add__(self, other): return Point(self.x+other.x,self.y+other.y)
     def __sub__(self, other): return Point(self.x-other.x,self.y-other.y)
     def __mul__(self, factor): return Point(self.x*factor, self.y*factor)
-    def length(self): return (self.y*self.y + self.x*self.x) ** 0.5
+    def length(self): return math.hypot(self.x, self.y)
     def int_xy(self): return int(self.x+0.5), int(self.y+0.5)
     def left90(self): return Point(-self.y, self.x)
 
@@ -258,6 +260,9 @@ class Config:
         '.':'.'
     }
 
+    # The edge alphabet, for validating forms with one C-level set difference.
+    valid_edges = frozenset(compatabilities)
+
     # Hexagonal connection pattern:
     #
     #     o o
@@ -329,244 +334,340 @@ class Config:
         else:
             raise Exception("Too many connections specified in some items (more than 8).")
 
+        # The lattice-to-cartesian transform as four plain coefficients so
+        # hot mapping code multiplies floats instead of composing Points.
+        self.transform = (self.x_mapper.x, self.y_mapper.x,
+                          self.x_mapper.y, self.y_mapper.y)
+
         for i, item in enumerate(self.forms):
             missings = count - len(item)
             if missings:
                 self.forms[i] = item + '-' * missings
-            for edge in item:
-                if edge not in Config.compatabilities:
-                    raise Exception("No compatible connection for form #%d (%s)." % (i+1, item))
+            if set(item) - Config.valid_edges:
+                raise Exception("No compatible connection for form #%d (%s)." % (i+1, item))
 
 
 # ========================================================================
 # Config parser. Convert the text description into a Config.
 
-def parse_common(name_and_synonyms, text):
-    """Check if the given text contains an assignment to the given named option, return the value or None."""
-    if '=' not in text:
-        return None
-    for name in name_and_synonyms:
-        arg, val = text.split('=')
-        if arg.lower() == name:
-            return val
-    return None
-
-def parse_bool(self, name_and_synonyms, text):
-    """Check if the given text contains a boolean assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    setattr(self, name_and_synonyms[0], bool(int(val)))
-    return True
-
-def parse_float(self, name_and_synonyms, text):
-    """Check if the given text contains a real number assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    setattr(self, name_and_synonyms[0], float(val))
-    return True
-
-def parse_int(self, name_and_synonyms, text):
-    """Check if the given text contains an integer number assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    setattr(self, name_and_synonyms[0], int(val))
-    return True
-
-def parse_text(self, name_and_synonyms, text):
-    """Check if the given text contains an assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    setattr(self, name_and_synonyms[0], val)
-    return True
-
-def parse_color(self, name_and_synonyms, text):
-    """Check if the given text contains a color assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    if not all([c in '0123456789abcdefABCDEF' for c in val]):
-        raise Exception('Color description "%s" for %s is not in hexadecimal.' %(val, name_and_synonyms[0]))
-    setattr(self, name_and_synonyms[0], val)
-    return True
-
-def parse_colors(name_and_synonyms, text, sep=','):
+def parse_bool(self, name, val):
+    """Assign a boolean option value to the given named option."""
+    setattr(self, name, bool(int(val)))
+
+def parse_float(self, name, val):
+    """Assign a real number option value to the given named option."""
+    setattr(self, name, float(val))
+
+def parse_int(self, name, val):
+    """Assign an integer option value to the given named option."""
+    setattr(self, name, int(val))
+
+def parse_text(self, name, val):
+    """Assign a text option value to the given named option."""
+    setattr(self, name, val)
+
+hex_re = re.compile('[0-9a-fA-F]*')
+validated_hex = set()   # interned color strings already known to be valid hex
+
+def parse_color(self, name, val):
+    """Assign a color option value to the given named option."""
+    if not hex_re.fullmatch(val):
+        raise Exception('Color description "%s" for %s is not in hexadecimal.' %(val, name))
+    setattr(self, name, val)
+
+def parse_colors(name, text, sep=','):
     """Convert the given text into separate color text."""
     new_colors = []
     for i, color in enumerate(text.split(sep)):
-        if not all([c in '0123456789abcdefABCDEF' for c in color]):
-            raise Exception('Color description "%s" for %s is not in hexadecimal.' %(color, name_and_synonyms[0]))
+        # Palettes repeat the same tokens across configs; intern them so
+        # reloads share storage and the validation runs once per token.
+        color = sys.intern(color)
+        if color not in validated_hex:
+            if not hex_re.fullmatch(color):
+                raise Exception('Color description "%s" for %s is not in hexadecimal.' %(color, name))
+            validated_hex.add(color)
         new_colors.append(color)
     return new_colors
 
-def parse_colors_array(self, name_and_synonyms, text):
-    """Check if the given text contains a multiple colors assignment to the given named option, return True if successfully parsed."""
-    val = parse_common(name_and_synonyms, text)
-    if not val:
-        return False
-    new_colors = parse_colors(name_and_synonyms, val)
+def parse_colors_array(self, name, val):
+    """Assign a multiple colors option value to the given named option."""
+    new_colors = parse_colors(name, val)
     self.colors[0:len(new_colors)] = new_colors
-    return True
+
+# Option name (or synonym) -> (canonical name, parser), built once so each
+# config token dispatches with a single dict lookup.
+parsers = {
+    ('knot',)             : parse_bool,
+    ('border',)           : parse_bool,
+    ('fill',)             : parse_bool,
+    ('thickness',)        : parse_float,
+    ('width', 'w',)       : parse_int,
+    ('height', 'h',)      : parse_int,
+    ('background', 'bg',) : parse_color,
+    ('foreground', 'fg',) : parse_color,
+    ('colors',)           : parse_colors_array,
+    ('grid',)             : parse_bool,
+    ('labels',)           : parse_bool,
+    ('name',)             : parse_text,
+}
+parsers = { name: (names[0], parser)
+            for names, parser in parsers.items() for name in names }
 
 def parse_config(self, text):
     """Convert the given text into the known options and assign them to self. Return the array of text not matching any options."""
-    parsers = {
-        ('knot',)             : parse_bool,
-        ('border',)           : parse_bool,
-        ('fill',)             : parse_bool,
-        ('thickness',)        : parse_float,
-        ('width', 'w',)       : parse_int,
-        ('height', 'h',)      : parse_int,
-        ('background', 'bg',) : parse_color,
-        ('foreground', 'fg',) : parse_color,
-        ('colors',)           : parse_colors_array,
-        ('grid',)             : parse_bool,
-        ('labels',)           : parse_bool,
-        ('name',)             : parse_text,
-    }
-
     for c in text.split():
-        for arg, parser in parsers.items():
-            if parser(self, arg, c):
-                break
-        else:
-            self.forms.append(c)
+        if '=' in c:
+            arg, val = c.split('=', 1)
+            known = parsers.get(arg.lower())
+            if known and val:
+                name, parser = known
+                parser(self, name, val)
+                continue
+        self.forms.append(c)
 
 
 # ========================================================================
 # Tiling processing.
 
+# Grid coordinates are packed into a single int so the many dict and set
+# operations on tile sites hash one int instead of allocating and hashing
+# a 2-tuple. A neighbour step is then a single int addition.
+point_stride = 1 << 20
+
+def pack_point(y, x):
+    return y * point_stride + x
+
+def unpack_point(key):
+    y = (key + (point_stride >> 1)) // point_stride
+    return y, key - y * point_stride
+
+
 class Assembler:
     def __init__(self, connections, compatabilities, forms, probabilities, point_set):
         self.connections = connections    # [(y,x,index of reverse connection)]
         self.compatabilities = compatabilities    # { edge-char -> edge-char }
-        self.point_set = point_set   # set of (y,x)
+        self.point_set = point_set   # set of packed points
 
         self.basic_forms = forms   # ['edge types']
         self.forms = [ ]   # ['edge types']
         self.form_id = [ ]   # [original form number]
         self.rotation = [ ]  # [rotation from original]
         self.probabilities = [ ]
-        self.tiles = { }   # (y,x) -> form number
-        self.dirty = set()   # set of (y,x) -- Possible sites for adding tiles
-        self.options_cache = { }   # pattern -> [form_ids]
-        self.dead_loci = set([ ]) # [ {(y,x)->form number} ]
+        self.tiles = { }   # packed point -> form number
+        self.link_count = { }   # packed point -> placed neighbour edges linking to it
+        self.dirty = set()   # set of packed points -- Possible sites for adding tiles
+        self.dirty_sum_y = 0   # Rolling coordinate sums so the centroid of
+        self.dirty_sum_x = 0   # the dirty sites is O(1) per iteration.
+        self.options_cache = { }   # packed neighbour form ids -> (form numbers)
+        self.site_keys = { }   # packed point -> packed neighbour form ids
+        self.dead_loci = collections.OrderedDict() # frozenset locus -> True, oldest evicted first
         self.history = [ ]
         self.changes = { }
 
+        seen = set()
         for id, form in enumerate(forms):
             current = form
             for i in range(len(self.connections)):
-                if current not in self.forms:
+                if current not in seen:
+                    seen.add(current)
                     self.forms.append(current)
                     self.form_id.append(id)
                     self.rotation.append(i)
                     self.probabilities.append(probabilities[id])
                 current = current[1:] + current[0]
 
+        # Integer edge encoding for the hot fitting loops: each edge character
+        # gets a small code, with '.' mapped to zero so a zero byte means
+        # "matches anything". Forms become bytes so comparing edges is a
+        # byte-wise compare instead of per-character string and dict lookups.
+        self.edge_code = { '.': 0 }   # edge char -> small int code
+        for c in sorted(self.compatabilities):
+            if c not in self.edge_code:
+                self.edge_code[c] = len(self.edge_code)
+        self.compat_code = bytes(   # edge code -> code of the complementary edge
+            self.edge_code[self.compatabilities[c]]
+            for c, code in sorted(self.edge_code.items(), key=lambda item: item[1]))
+        self.form_codes = [ bytes(self.edge_code[c] for c in form) for form in self.forms ]
+        self.dash_code = self.edge_code['-']
+        # What a neighbour with a given form requires on each of its edges:
+        # the complementary codes, precomputed so the options() miss path
+        # does a single indexed load per neighbour.
+        self.neighbour_edge = [ bytes(self.compat_code[c] for c in form)
+                                for form in self.form_codes ]
+        self.opposites = [ opposite for oy, ox, opposite in self.connections ]
+
+        # For each edge slot and required edge code, a bitmask of the forms
+        # whose edge fits, so matching a whole pattern is a bitwise AND.
+        # Code 0 ('.') constrains nothing and selects the all-ones mask.
+        all_forms_mask = (1 << len(self.forms)) - 1
+        self.slot_masks = [ ]   # [slot][edge code] -> bitmask of fitting forms
+        for i in range(len(self.connections)):
+            masks = [ all_forms_mask ]
+            for code in range(1, len(self.edge_code)):
+                mask = 0
+                for f, form in enumerate(self.form_codes):
+                    if form[i] == code:
+                        mask |= 1 << f
+                masks.append(mask)
+            self.slot_masks.append(masks)
+
+        # The neighbour offsets as packed-point deltas, parallel to connections.
+        self.packed_offsets = [ pack_point(oy, ox) for oy, ox, opposite in self.connections ]
+
+        # The connection count is fixed per Assembler (4, 6 or 8), so build a
+        # neighbour-key gatherer specialized to it, with the scan unrolled.
+        # The surrounding form ids are packed into a single int (one slot of
+        # key_shift bits per connection, empty = 0) so the options cache
+        # hashes one machine word instead of allocating a tuple.
+        self.key_shift = (len(self.forms) + 1).bit_length()
+        gathers = ' | '.join('(tiles_get(key%+d, -1)+1) << %d' % (offset, self.key_shift*i)
+                             for i, offset in enumerate(self.packed_offsets))
+        namespace = { }
+        exec('def neighbour_key(tiles_get, key):\n    return %s' % gathers, namespace)
+        self.neighbour_key = namespace['neighbour_key']
+
+    def add_dirty(self, key):
+        if key not in self.dirty:
+            self.dirty.add(key)
+            y, x = unpack_point(key)
+            self.dirty_sum_y += y
+            self.dirty_sum_x += x
+
+    def discard_dirty(self, key):
+        if key in self.dirty:
+            self.dirty.remove(key)
+            y, x = unpack_point(key)
+            self.dirty_sum_y -= y
+            self.dirty_sum_x -= x
+
     def update_point_set(self, point_set):
         for pt in point_set:
             if pt not in self.point_set:
-                for oy, ox, opposite in self.connections:
-                    neighbor = (pt[0] + oy, pt[1] + ox)
+                for offset in self.packed_offsets:
+                    neighbor = pt + offset
                     if neighbor not in point_set:
                         continue
                     if neighbor in self.dirty:
                         continue
                     if neighbor in self.tiles:
+                        self.remove_links(neighbor, self.tiles[neighbor])
                         del self.tiles[neighbor]
-                        self.dirty.add(neighbor)
+                        self.add_dirty(neighbor)
         for pt in list(self.tiles):
             if pt not in point_set:
+                self.remove_links(pt, self.tiles[pt])
                 del self.tiles[pt]
+        self.site_keys.clear()
         self.point_set = point_set
 
-    def put(self, y,x, value):
-        if (y,x) in self.changes:
-            if value == self.changes[(y,x)]:
-                del self.changes[(y,x)]
+    def put(self, pt, value):
+        if pt in self.changes:
+            if value == self.changes[pt]:
+                del self.changes[pt]
         else:
-            self.changes[(y,x)] = self.tiles.get((y,x),None)
+            self.changes[pt] = self.tiles.get(pt,None)
 
         if value == None:
-            if (y,x) not in self.tiles: return
-            del self.tiles[(y,x)]
-            self.dirty.add((y,x))
+            if pt not in self.tiles: return
+            self.remove_links(pt, self.tiles[pt])
+            del self.tiles[pt]
+            self.add_dirty(pt)
         else:
-            self.tiles[(y,x)] = value
-
-        for oy, ox, opposite in self.connections:
-            y1 = y + oy
-            x1 = x + ox
-            if (y1,x1) not in self.tiles and (y1, x1) in self.point_set:
-                self.dirty.add((y1,x1))
-
-    def get_pattern(self, y,x):
-        result = ''
-        for oy, ox, opposite in self.connections:
-            y1 = y + oy
-            x1 = x + ox
-            if (y1,x1) in self.tiles:
-                result += self.compatabilities[self.forms[self.tiles[(y1,x1)]][opposite]]
-            #elif (y1,x1) not in self.point_set:
-            #    result += ' '
-            else:
-                result += '.'
-
-        return result
-
-    def fit_ok(self, pattern,form_number):
-        form = self.forms[form_number]
-        for i in range(len(self.connections)):
-            if pattern[i] != '.' and pattern[i] != form[i]:
-                return False
-
-        return True
-
-    def options(self, y,x):
-        pattern = self.get_pattern(y,x)
-        if pattern in self.options_cache:
-            return self.options_cache[pattern]
+            old = self.tiles.get(pt)
+            if old is not None:
+                self.remove_links(pt, old)
+            self.tiles[pt] = value
+            self.add_links(pt, value)
+
+        site_keys_pop = self.site_keys.pop
+        for offset in self.packed_offsets:
+            neighbour = pt + offset
+            site_keys_pop(neighbour, None)
+            if neighbour not in self.tiles and neighbour in self.point_set:
+                self.add_dirty(neighbour)
+
+    def add_links(self, pt, value):
+        # Count, per site, the placed neighbour edges linking to it, so
+        # any_links_to is a lookup instead of a neighbour scan.
+        form = self.form_codes[value]
+        dash = self.dash_code
+        link_count = self.link_count
+        for i, offset in enumerate(self.packed_offsets):
+            if form[i] != dash:
+                neighbour = pt + offset
+                link_count[neighbour] = link_count.get(neighbour, 0) + 1
+
+    def remove_links(self, pt, value):
+        form = self.form_codes[value]
+        dash = self.dash_code
+        link_count = self.link_count
+        for i, offset in enumerate(self.packed_offsets):
+            if form[i] != dash:
+                neighbour = pt + offset
+                count = link_count[neighbour] - 1
+                if count:
+                    link_count[neighbour] = count
+                else:
+                    del link_count[neighbour]
+
+    def options(self, pt):
+        key = self.site_keys.get(pt)
+        if key is None:
+            key = self.site_keys[pt] = self.neighbour_key(self.tiles.get, pt)
+        if key in self.options_cache:
+            return self.options_cache[key]
+
+        slot_masks = self.slot_masks
+        neighbour_edge = self.neighbour_edge
+        opposites = self.opposites
+        shift = self.key_shift
+        slot = (1 << shift) - 1
+        mask = (1 << len(self.forms)) - 1
+        packed = key
+        for i in range(len(opposites)):
+            id = (packed & slot) - 1
+            if id >= 0:
+                mask &= slot_masks[i][neighbour_edge[id][opposites[i]]]
+            packed >>= shift
 
         result = [ ]
-        for i in range(len(self.forms)):
-            if self.fit_ok(pattern,i):
-                result.append(i)
+        while mask:
+            low = mask & -mask
+            result.append(low.bit_length() - 1)
+            mask -= low
         result = tuple(result)
 
-        self.options_cache[pattern] = result
+        self.options_cache[key] = result
 
         return result
 
-    def locus(self, y,x, rotation=0):
-        visited = { }
-        neighbours = { }
-        todo = [ ((y,x), (0,0)) ]
+    def locus(self, pt, rotation=0):
+        visited = set()
+        neighbours = set()
+        todo = collections.deque([ (pt, (0,0)) ])
         result = [ ]
 
         min_y = 1<<30
         min_x = 1<<30
 
         while todo:
-            current, offset = todo.pop(0)
+            current, offset = todo.popleft()
             if current in visited: continue
-            visited[current] = True
+            visited.add(current)
 
             any = False
             new_todo = [ ]
-            for i, (oy, ox, opposite) in enumerate(self.connections):
-                neighbour = (current[0]+oy, current[1]+ox)
+            for i, packed_offset in enumerate(self.packed_offsets):
+                neighbour = current + packed_offset
                 if neighbour in self.point_set:
                     if neighbour in self.tiles:
                         any = True
-                        neighbours[neighbour] = True
+                        neighbours.add(neighbour)
+                        opposite = self.opposites[i]
                         min_y = min(min_y, offset[0])
                         min_x = min(min_x, offset[1])
                         result.append( (offset, opposite,
-                                        self.forms[self.tiles[neighbour]][opposite]) )
+                                        self.form_codes[self.tiles[neighbour]][opposite]) )
                     else:
                         temp = self.connections[(i+rotation) % len(self.connections)]
                         new_offset = (offset[0]+temp[0], offset[1]+temp[1])
@@ -574,7 +675,7 @@ class Assembler:
 
             if not any and len(self.connections) == 4:
                 for oy, ox in ((-1,-1), (-1,1), (1,-1), (1,1)):
-                    neighbour = (current[0]+oy, current[1]+ox)
+                    neighbour = current + pack_point(oy, ox)
                     if neighbour in self.tiles:
                         any = True
                         break
@@ -582,87 +683,91 @@ class Assembler:
             if any:
                 todo.extend(new_todo)
 
-        result = [ (yy-min_y,xx-min_x,a,b) for ((yy,xx),a,b) in result ]
+        # Pack each entry into one int so the locus frozenset hashes and
+        # compares machine words instead of 4-tuples.
+        result = frozenset( ((yy-min_y) * point_stride + (xx-min_x)) << 12 | a << 8 | b
+                            for ((yy,xx),a,b) in result )
 
-        return frozenset(result), visited, neighbours
+        return result, visited, neighbours
 
 
-    def filter_options(self, y,x,options):
+    def filter_options(self, pt, options):
+        # Until the first backtrack there are no dead loci to test against.
+        if not self.dead_loci:
+            return list(options)
+
+        # The empty neighbours to probe are the same whatever form is tried.
+        empties = [ pt + offset for offset in self.packed_offsets
+                    if pt + offset not in self.tiles and pt + offset in self.point_set ]
+
         result = [ ]
         for i in options:
-            self.tiles[(y,x)] = i
-            visiteds = [ ]
-
-            for oy, ox, oppoiste in self.connections:
-                y1 = y+oy
-                x1 = x+ox
-
-                ok = True
-                if (y1,x1) not in self.tiles and (y1,x1) in self.point_set:
-                    for visited in visiteds:
-                        if (y1,x1) in visited:
-                            ok = False
-                            break
-                    if ok:
-                        locus, visited, _ = self.locus(y1,x1)
-                        visiteds.append(visited)
-                        if locus is not None and locus in self.dead_loci:
-                            break
+            self.tiles[pt] = i
+            visited_union = set()
+
+            for neighbour in empties:
+                if neighbour in visited_union:
+                    continue
+                locus, visited, _ = self.locus(neighbour)
+                visited_union.update(visited)
+                if locus is not None and locus in self.dead_loci:
+                    break
             else:
                 result.append(i)
 
-            del self.tiles[(y,x)]
+            del self.tiles[pt]
 
         return result
 
-    def any_links_to(self, y,x):
-        for oy, ox, opposite in self.connections:
-            y1 = y + oy
-            x1 = x + ox
-            if (y1, x1) in self.tiles:
-                if self.forms[self.tiles[(y1,x1)]][opposite] != '-':
-                    return True
-        return False
+    def any_links_to(self, pt):
+        return pt in self.link_count
 
-    def prune_dead_loci(self):
-        for item in list(self.dead_loci):
-            if random.randrange(2):
-                self.dead_loci.remove(item)
+    def add_dead_locus(self, locus):
+        self.dead_loci[locus] = True
+        if len(self.dead_loci) > 5000:
+            self.dead_loci.popitem(last=False)
 
     def iterate(self):
         if not self.tiles:
-            self.put(0,0,0)
-            self.history.append((0,0))
+            origin = pack_point(0,0)
+            self.put(origin,0)
+            self.history.append(origin)
             return True
 
-        mid_y = 0.0
-        mid_x = 0.0
-        for y, x in list(self.dirty): # Note: need to convert to list because we modify the set in the loop.
-            if (y,x) in self.tiles or not self.any_links_to(y,x):
-                self.dirty.remove((y,x))
-                continue
-            mid_y += y
-            mid_x += x
+        for pt in list(self.dirty): # Note: need to convert to list because we modify the set in the loop.
+            if pt in self.tiles or not self.any_links_to(pt):
+                self.discard_dirty(pt)
 
         if not self.dirty:
             return False
 
-        mid_y /= len(self.dirty)
-        mid_x /= len(self.dirty)
+        mid_y = self.dirty_sum_y / len(self.dirty)
+        mid_x = self.dirty_sum_x / len(self.dirty)
 
+        cy = mid_y * 2
+        cxy = mid_x * 2 + mid_y
         point_list = [ ]
-        for y, x in self.dirty:
-            yy = y - mid_y
-            xx = x - mid_x
-            sorter = ((yy*2)**2+(xx*2+yy)**2)
-            point_list.append( (sorter,y,x) )
+        for pt in self.dirty:
+            y, x = unpack_point(pt)
+            point_list.append( ((y*2-cy)**2 + (x*2+y-cxy)**2, pt) )
 
-        point_list.sort()
+        # A full sort is wasted when the scan below usually stops at the
+        # first forced site: heapify is O(n) and pops arrive in the same
+        # (distance, point) order the sort produced.
+        heapq.heapify(point_list)
 
         best = None
 
-        for sorter, y, x in point_list:
-            options = self.options(y,x)
+        while point_list:
+            sorter, pt = heapq.heappop(point_list)
+            options = self.options(pt)
+
+            if not options:
+                # Dead site: nothing can ever fit here, backtrack right away
+                # without scoring the remaining sites or filtering loci.
+                best = options
+                best_pt = pt
+                break
 
             if len(options) < 2:
                 score = 0
@@ -672,33 +777,32 @@ class Assembler:
             if best == None or score < best_score:
                 best = options
                 best_score = score
-                best_x = x
-                best_y = y
+                best_pt = pt
                 if score == 0: break
 
         if best == None: return False
 
-        best = self.filter_options(best_y,best_x,best)
+        if best:
+            best = self.filter_options(best_pt,best)
 
         if len(best) > 0:
-            ws = []
-            for i in best:
-                ws.append(self.probabilities[i])
-            self.put(best_y,best_x,random.choices(best, weights=ws)[0])
-            self.history.append((best_y,best_x))
+            if len(best) == 1:
+                # Forced placement, the common case: skip the weighted draw.
+                self.put(best_pt,best[0])
+            else:
+                cum = list(itertools.accumulate(self.probabilities[i] for i in best))
+                self.put(best_pt,best[bisect.bisect(cum, random.random() * cum[-1])])
+            self.history.append(best_pt)
             return True
 
         #otherwise, backtrack:
 
         for i in range(len(self.connections)):
-            locus, _, relevant = self.locus(best_y,best_x,i)
+            locus, _, relevant = self.locus(best_pt,i)
             if locus is None: break
-            self.dead_loci.add(locus)
+            self.add_dead_locus(locus)
             if len(locus) > 8: break
 
-        if len(self.dead_loci) > 10000:
-            self.prune_dead_loci()
-
         # Shape of distribution
         autism = 1.0 # 1.0 == normal, >1.0 == autistic (just a theory :-) )
 
@@ -710,9 +814,8 @@ class Assembler:
             n += 1
 
         while self.history and (n > 0 or
-                                self.locus(best_y,best_x)[0] in self.dead_loci):
-            item = self.history.pop(-1)
-            self.put(item[0],item[1],None)
+                                self.locus(best_pt)[0] in self.dead_loci):
+            self.put(self.history.pop(-1),None)
             n -= 1
 
         if not self.tiles:
@@ -724,28 +827,21 @@ class Assembler:
 # ========================================================================
 # Some maths helpers.
 
-def val2pt(vals):
-    return [QtCore.QPoint(int(p[0]),int(p[1])) for p in vals]
+def val2poly(vals):
+    return QtGui.QPolygon([QtCore.QPoint(int(p[0]),int(p[1])) for p in vals])
+
+# Bernstein basis of a cubic bezier, sampled once at the fixed tessellation steps.
+bezier_basis = [ ((1-u)*(1-u)*(1-u), 3*u*(1-u)*(1-u), 3*u*u*(1-u), u*u*u)
+                 for u in (i / 12.0 for i in range(1,12)) ]
 
 def bezier(a,b,c,d):
-    result = [ ]
-    n = 12
-    for i in range(1,n):
-        u = float(i) / n
-        result.append(
-            a * ((1-u)*(1-u)*(1-u)) +
-            b * (3*u*(1-u)*(1-u)) +
-            c * (3*u*u*(1-u)) +
-            d * (u*u*u)
-        )
-    return result
+    return [ Point(a.x*ba + b.x*bb + c.x*bc + d.x*bd,
+                   a.y*ba + b.y*bb + c.y*bc + d.y*bd)
+             for ba,bb,bc,bd in bezier_basis ]
 
+@functools.lru_cache(maxsize=4096)
 def normalize(form):
-    best = form
-    for i in range(len(form)-1):
-        form = form[1:] + form[0]
-        if form > best: best = form
-    return best
+    return max(form[i:] + form[:i] for i in range(len(form)))
 
 
 # ========================================================================
@@ -779,8 +875,16 @@ def eatException(f):
 
     return wrapper
 
+@functools.lru_cache(maxsize=None)
 def alloc_color(text):
     """Convert a text description of a color in hexadecimal into a QColor."""
+    # The common 3- and 6-digit forms parse in one int() call.
+    if len(text) == 3:
+        v = int(text, 16)
+        return QtGui.QColor((v>>8)*255//16, ((v>>4)&0xf)*255//16, (v&0xf)*255//16)
+    if len(text) == 6:
+        v = int(text, 16)
+        return QtGui.QColor((v>>16)*255//256, ((v>>8)&0xff)*255//256, (v&0xff)*255//256)
     comp = []
     steps = max(1,len(text)//3)
     for i in range(0,len(text),steps):
@@ -889,16 +993,17 @@ def add_quit_shortcut(shortcut, widget):
 # UI
 
 
-class Canvas(QtWidgets.QFrame):
+class Canvas(QtWidgets.QWidget):
     """UI -- a canvas that signals when repaints or resizes are triggered."""
 
     painting = QtCore.pyqtSignal(['QPainter'])
     resizing = QtCore.pyqtSignal(['QSize'])
 
     def __init__(self):
-        QtWidgets.QFrame.__init__(self)
+        QtWidgets.QWidget.__init__(self)
         self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
         self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+        self.setAttribute(QtCore.Qt.WA_StaticContents)
         self.window = self
 
     @eatException
@@ -992,8 +1097,14 @@ class Interface(QtCore.QObject):
         self.labels = ConfigOverrideVal(True)
         self.randomizing = False
         self.iteration = 0
-        self.shapes = { }
-        self.polys = { }
+        self.shapes = collections.OrderedDict() # bounded: shape geometry per (form, rotation, knot, corner)
+        self.sprites = { }
+        self.sprite_reach = 0
+        self.grid_polys = None
+        self.base_pixmap = None
+        self.base_key = None
+        self.pens = { }
+        self.brushes = { }
         self.assembler = None
         self.timer = None
         self.error = None
@@ -1008,7 +1119,7 @@ class Interface(QtCore.QObject):
         self.canvas.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         canvas_frame = make_hbox(0, self.canvas)
         canvas_frame.setLineWidth(1)
-        canvas_frame.setFrameStyle(Canvas.Box)
+        canvas_frame.setFrameStyle(QtWidgets.QFrame.Box)
 
         tilings_label = QtWidgets.QLabel('Tilings:')
         tilings_label.setSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
@@ -1109,8 +1220,6 @@ class Interface(QtCore.QObject):
     @showException
     def on_set_corner(self, value):
         self.corner = value
-        self.shapes = {}
-        self.polys = {}
         self.update_full_canvas()
 
     @showException
@@ -1140,9 +1249,7 @@ class Interface(QtCore.QObject):
 
     @showException
     def on_knot_changed(self, state):
-        if self.on_something_changed(self.knot, state):
-            self.shapes = {}
-            self.polys = {}
+        self.on_something_changed(self.knot, state)
 
     @showException
     def on_labels_changed(self, state):
@@ -1173,28 +1280,60 @@ class Interface(QtCore.QObject):
     @showException
     def on_idle(self):
         """This is where the processing to generate a tiling is done."""
-        if not self.assembler.iterate():
-            self.timer.stop()
-            self.timer = None
-            self.update_full_canvas()
-
-        self.iteration += 1
+        # Run a time-boxed slice of iterations per tick: one Qt timer
+        # dispatch then covers many solver steps and the repaint below
+        # coalesces the whole slice.
+        start = self.iteration
+        deadline = time.perf_counter() + 0.008
+        while True:
+            if not self.assembler.iterate():
+                self.timer.stop()
+                self.timer = None
+                self.update_full_canvas()
+                break
+            self.iteration += 1
+            if time.perf_counter() >= deadline:
+                break
 
-        if self.randomizing and (self.iteration == 100 or not self.timer):
+        if self.randomizing and (self.iteration >= 100 or not self.timer):
             self.randomizing = False
 
-            forms_present = { }
+            forms_present = set()
             for item in self.assembler.tiles.values():
-                forms_present[self.assembler.form_id[item]] = 1
+                forms_present.add(self.assembler.form_id[item])
 
             if len(self.assembler.tiles) < 10 \
                or len(forms_present) < len(self.assembler.basic_forms):
                 self.random(True)
-
-        if self.iteration % 8 == 0:
-            if self.iteration % 1000 == 0:
+            else:
                 self.full_paint = True
+
+        if self.randomizing:
+            # Candidate tilings are judged, not shown; don't schedule
+            # repaints until one is accepted.
+            return
+
+        if self.iteration // 1000 != start // 1000:
+            self.full_paint = True
+
+        if self.full_paint:
             self.canvas.update()
+        elif self.assembler.changes:
+            # Only ask for a repaint of the area covered by the pending
+            # changes; Qt coalesces the update regions between paint events.
+            reach = max(self.sprite_reach, self.scale * 4) + 4
+            min_x = min_y = 1<<30
+            max_x = max_y = -(1<<30)
+            for pt in self.assembler.changes:
+                ty, tx = unpack_point(pt)
+                p = self.pos(tx*2, ty*2)
+                min_x = min(min_x, p.x)
+                min_y = min(min_y, p.y)
+                max_x = max(max_x, p.x)
+                max_y = max(max_y, p.y)
+            self.canvas.update(QtCore.QRect(
+                int(min_x - reach), int(min_y - reach),
+                int(max_x - min_x + reach*2) + 1, int(max_y - min_y + reach*2) + 1))
 
     @showException
     def on_paint(self, painter):
@@ -1264,10 +1403,11 @@ class Interface(QtCore.QObject):
 
     def update_assembler(self):
         if self.assembler:
-            self.shapes = { }
-            self.polys = { }
             self.assembler.update_point_set(self.create_point_set())
             self.start_idling()
+        # The point set just changed shape, so the cached grid layer no
+        # longer matches even though the key inputs may read the same.
+        self.base_key = None
         self.update_full_canvas()
 
     def create_point_set(self):
@@ -1285,11 +1425,23 @@ class Interface(QtCore.QObject):
             maxx = self.width  + bound
             miny = -bound
             maxy = self.height + bound
+        # Inline the lattice transform so the full sweep over candidate
+        # cells runs on plain floats instead of allocating a Point per cell.
+        m00, m01, m10, m11 = self.config.transform
+        s = self.scale * 4
+        ax = m00 * s
+        ay = m10 * s
+        cx = self.width  / 2.0
+        cy = self.height / 2.0
         for y in range(-yr,yr):
+            bx = m01 * s * y + cx
+            by = m11 * s * y + cy
+            base = pack_point(y, 0)
             for x in range(-xr,xr):
-                point = self.pos(x*2, y*2)
-                if point.x > minx and point.x < maxx and point.y > miny and point.y < maxy:
-                    point_set.add((y,x))
+                px = ax * x + bx
+                py = ay * x + by
+                if px > minx and px < maxx and py > miny and py < maxy:
+                    point_set.add(base + x)
         return point_set
 
     def reset(self, index = 0):
@@ -1312,6 +1464,7 @@ class Interface(QtCore.QObject):
 
         self.background = alloc_color(self.config.background)
         self.foreground = alloc_color(self.config.foreground)
+        self.grid_color = tweak_color_value(self.background)
         self.colors = [ alloc_color(item) for item in self.config.colors ]
 
         self.apply_current_color_scheme()
@@ -1320,8 +1473,9 @@ class Interface(QtCore.QObject):
 
         self.randomizing = False
         self.iteration = 0
-        self.shapes = { }
-        self.polys = { }
+        self.sprites = { }
+        self.sprite_reach = 0
+        self.grid_polys = None
         self.full_paint = True
         self.assembler = Assembler(self.config.connections, Config.compatabilities,
                                    self.config.forms, self.config.probabilities, point_set)
@@ -1359,22 +1513,24 @@ class Interface(QtCore.QObject):
         result = [ ]
         def zut(result):
             result.clear()
-            previous = '1234' + 'aAbBcCdD' #* 3
+            seen = set()
+            previous = list('1234' + 'aAbBcCdD') #* 3
             for edge_count in edge_counts:
                 item = ['-']*(sides-edge_count)
                 for j in range(edge_count):
                     selection = random.choice(previous)
-                    previous += Config.compatabilities[selection]*6 #12
+                    previous.extend(Config.compatabilities[selection]*6) #12
                     item.append(selection)
 
                 random.shuffle(item)
                 item = normalize(''.join(item))
-                if item in result: return True
+                if item in seen: return True
+                seen.add(item)
                 result.append(item)
 
-            all = ''.join(result)
+            present = set(''.join(result))
             for a, b in Config.compatabilities.items():
-                if a in all and b not in all: return True
+                if a in present and b not in present: return True
             return False
         while zut(result):
             pass
@@ -1389,6 +1545,9 @@ class Interface(QtCore.QObject):
 
     def update_full_canvas(self):
         """Force a full repaint of the canvas."""
+        self.sprites = { }
+        self.sprite_reach = 0
+        self.grid_polys = None
         self.full_paint = True
         self.canvas.update()
 
@@ -1408,15 +1567,27 @@ class Interface(QtCore.QObject):
         self.colors[0:len(new_colors)] = new_colors
 
     def pos(self, x,y, center=True):
-        result = (self.config.x_mapper*x + self.config.y_mapper*y) * (self.scale*2)
+        m00, m01, m10, m11 = self.config.transform
+        s = self.scale*2
+        px = (m00*x + m01*y) * s
+        py = (m10*x + m11*y) * s
         if center:
-            return result + Point(self.width/2.0,self.height/2.0)
+            return Point(px + self.width/2.0, py + self.height/2.0)
         else:
-            return result
+            return Point(px, py)
 
     def make_shape(self, form_number):
-        if form_number in self.shapes:
-            return self.shapes[form_number]
+        # The shape is computed in unit coordinates (the lattice transform
+        # without the scale factor), so the cache survives scale changes and
+        # resets; only the rasterized sprites depend on scale.
+        key = (self.assembler.forms[form_number],
+               self.assembler.rotation[form_number],
+               bool(self.knot), self.corner)
+        if key in self.shapes:
+            self.shapes.move_to_end(key)
+            return self.shapes[key]
+
+        m00, m01, m10, m11 = self.config.transform
 
         result = [ ]
         connections = { }
@@ -1428,7 +1599,7 @@ class Interface(QtCore.QObject):
             symbol = self.assembler.forms[form_number][i]
             if symbol in '.-': continue
 
-            edge = self.pos(xx, yy, False)
+            edge = Point(m00*xx + m01*yy, m10*xx + m11*yy)
             out = edge
             left = out.left90()
 
@@ -1462,7 +1633,7 @@ class Interface(QtCore.QObject):
             connections[i] = points
 
         if len(result) == 1:
-            point = result[0][0]*(self.scale*-0.7)
+            point = result[0][0]*-0.35
             result.append( (result[0][0].left90()*-1.0, [point], 0.8) )
             result.append( (result[0][0].left90(), [point], 0.8) )
 
@@ -1490,11 +1661,12 @@ class Interface(QtCore.QObject):
                         items.remove(item)
 
             if len(items)%2 != 0:
+                counts = collections.Counter(form)
                 for i in range(len(form)):
                     if form[i] not in '.-' and \
-                       form.count(form[i]) == 1 and \
+                       counts[form[i]] == 1 and \
                        (Config.compatabilities[form[i]] == form[i] or \
-                        form.count(Config.compatabilities[form[i]])%2 == 0):
+                        counts[Config.compatabilities[form[i]]]%2 == 0):
                         items.remove(i)
 
             if len(items)%2 != 0:
@@ -1505,7 +1677,7 @@ class Interface(QtCore.QObject):
             if len(items)%2 == 0:
                 rot = self.assembler.rotation[form_number]
                 mod = len(self.assembler.connections)
-                items.sort(key=functools.cmp_to_key(lambda a,b: (a+rot)%mod - (b+rot)%mod))
+                items.sort(key=lambda a: (a+rot)%mod)
                 step = len(items)//2
 
                 for ii in range(len(items)//2):
@@ -1517,9 +1689,9 @@ class Interface(QtCore.QObject):
                 a = connections[i]
                 b = connections[j]
                 a_in = (a[-1]-a[0]).left90()
-                a_in = a_in*(self.scale*1.25/a_in.length())
+                a_in = a_in*(0.625/a_in.length())
                 b_in = (b[-1]-b[0]).left90()
-                b_in = b_in*(self.scale*1.25/b_in.length())
+                b_in = b_in*(0.625/b_in.length())
                 a = [(a[0]+a[1])*0.5,a[1],(a[-2]+a[-1])*0.5]
                 b = [(b[0]+b[1])*0.5,b[1],(b[-2]+b[-1])*0.5]
                 bez1 = bezier(a[-1],a[-1]+a_in,b[0]+b_in,b[0])
@@ -1527,22 +1699,35 @@ class Interface(QtCore.QObject):
                 linker = a + bez1 + b + bez2
                 links.append((linker,a[-1:]+bez1+b[:1],b[-1:]+bez2+a[:1]))
 
-        self.shapes[form_number] = poly, links
+        self.shapes[key] = poly, links
+        if len(self.shapes) > 1024:
+            self.shapes.popitem(last=False)
         return poly, links
 
     def setPaintColors(self, painter, edge, fill):
         if edge:
-            pen = QtGui.QPen(edge)
-            pen.setWidth(max(1,int(self.thickness * self.config.thickness)))
-            pen.setCapStyle(QtCore.Qt.RoundCap)
-            pen.setJoinStyle(QtCore.Qt.RoundJoin)
-            painter.setPen(pen)
+            key = (edge.rgba(), max(1,int(self.thickness * self.config.thickness)))
+            pen = self.pens.get(key)
+            if pen is None:
+                pen = QtGui.QPen(edge)
+                pen.setWidth(key[1])
+                pen.setCapStyle(QtCore.Qt.RoundCap)
+                pen.setJoinStyle(QtCore.Qt.RoundJoin)
+                self.pens[key] = pen
         else:
-            painter.setPen(QtGui.QPen(QtCore.Qt.NoPen))
+            pen = self.pens.get(None)
+            if pen is None:
+                pen = self.pens[None] = QtGui.QPen(QtCore.Qt.NoPen)
+        painter.setPen(pen)
         if fill:
-            painter.setBrush(QtGui.QBrush(fill))
+            brush = self.brushes.get(fill.rgba())
+            if brush is None:
+                brush = self.brushes[fill.rgba()] = QtGui.QBrush(fill)
         else:
-            painter.setBrush(QtGui.QBrush(QtCore.Qt.NoBrush))
+            brush = self.brushes.get(None)
+            if brush is None:
+                brush = self.brushes[None] = QtGui.QBrush(QtCore.Qt.NoBrush)
+        painter.setBrush(brush)
 
     def setPaintFont(self, painter, size):
         font = painter.font()
@@ -1552,52 +1737,91 @@ class Interface(QtCore.QObject):
     def get_color(self, i):
         return self.colors[i % len(self.colors)]
 
-    def draw_poly(self, y,x,form_number, painter, erase=False):
-        id = (y,x,form_number)
-
-        if id not in self.polys:
-            def intify(points): return [ ((middle+point)).int_xy() for point in points ]
-
-            middle = self.pos(x*2,y*2)
-
-            poly, links = self.make_shape(form_number)
-            poly = intify(poly)
-            links = [ (intify(link), intify(line1), intify(line2)) for link,line1,line2 in links ]
+    def make_sprite(self, form_number, erase):
+        """Pre-rasterize a form into a pixmap so each placement is a blit."""
+        id = form_number*2 + bool(erase)
+        if id in self.sprites:
+            return self.sprites[id]
+
+        shape, links = self.make_shape(form_number)
+        if len(shape) == 0:
+            self.sprites[id] = None
+            return None
+
+        s = self.scale*2
+        margin = int(self.thickness * self.config.thickness) + 2
+        xs = [ point.x*s for point in shape ] + \
+             [ point.x*s for link,line1,line2 in links for point in link ]
+        ys = [ point.y*s for point in shape ] + \
+             [ point.y*s for link,line1,line2 in links for point in link ]
+        off_x = int(min(xs)) - margin
+        off_y = int(min(ys)) - margin
+        qpoint = QtCore.QPoint
+        # Build QPolygon objects so drawing hands Qt one sequence instead of
+        # unpacking a Python list of points as varargs.
+        def intify(points): return QtGui.QPolygon(
+            [ qpoint(int(point.x*s+0.5)-off_x, int(point.y*s+0.5)-off_y) for point in points ])
+
+        poly = intify(shape)
+        links = [ (intify(link), intify(line1), intify(line2)) for link,line1,line2 in links ]
+
+        pixmap = QtGui.QPixmap(int(max(xs)) - off_x + margin + 1, int(max(ys)) - off_y + margin + 1)
+        pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHints(QtGui.QPainter.Antialiasing
+                              |QtGui.QPainter.TextAntialiasing
+                              |QtGui.QPainter.SmoothPixmapTransform)
 
-            self.polys[id] = poly, links
+        if erase:
+            color = self.background
+            self.setPaintColors(painter, color, color)
         else:
-            poly, links = self.polys[id]
+            color = self.get_color(self.assembler.form_id[form_number])
+
+        if self.fill:
+            if not erase:
+                self.setPaintColors(painter, None, color)
+            painter.drawPolygon(poly)
 
-        if len(poly) > 0:
+        if self.knot:
             if erase:
-                color = self.background
-                self.setPaintColors(painter, color, color)
+                for link, line1, line2 in links:
+                    painter.drawPolygon(link)
+                    painter.drawPolyline(line1)
+                    painter.drawPolyline(line2)
             else:
-                color = self.get_color(self.assembler.form_id[form_number])
+                # The two painter states alternate per link; decide the line
+                # color once outside the loop.
+                line_color = color if self.fill else self.background
+                for link, line1, line2 in links:
+                    self.setPaintColors(painter, None, self.foreground)
+                    painter.drawPolygon(link)
+                    self.setPaintColors(painter, line_color, None)
+                    painter.drawPolyline(line1)
+                    painter.drawPolyline(line2)
 
-            if self.fill:
-                if not erase:
-                    self.setPaintColors(painter, None, color)
-                painter.drawPolygon(*val2pt(poly))
+        if self.border:
+            if not erase:
+                self.setPaintColors(painter, self.foreground, None)
+            painter.drawPolygon(poly)
 
-            if self.knot:
-                for link, line1, line2 in links:
-                    if not erase:
-                        self.setPaintColors(painter, None, self.foreground)
-                    painter.drawPolygon(*val2pt(link))
-                    if not erase:
-                        if self.fill:
-                            self.setPaintColors(painter, color, None)
-                        else:
-                            self.setPaintColors(painter, self.background, None)
-                    #painter.drawPolygon(*val2pt(link))
-                    painter.drawPolyline(*val2pt(line1))
-                    painter.drawPolyline(*val2pt(line2))
-
-            if self.border:
-                if not erase:
-                    self.setPaintColors(painter, self.foreground, None)
-                painter.drawPolygon(*val2pt(poly))
+        painter.end()
+
+        sprite = (pixmap, off_x, off_y)
+        self.sprites[id] = sprite
+        # Widest distance any cached sprite reaches from its tile center,
+        # used to size incremental update regions.
+        self.sprite_reach = max(self.sprite_reach, -off_x, -off_y,
+                                pixmap.width() + off_x, pixmap.height() + off_y)
+        return sprite
+
+    def draw_poly(self, y,x,form_number, painter, erase=False):
+        sprite = self.make_sprite(form_number, erase)
+        if sprite is None:
+            return
+        pixmap, off_x, off_y = sprite
+        middle = self.pos(x*2,y*2)
+        painter.drawPixmap(int(middle.x) + off_x, int(middle.y) + off_y, pixmap)
 
     def draw_text(self, painter, x, y, padding, with_rect, text):
         alignment = QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop | QtCore.Qt.TextWordWrap
@@ -1642,25 +1866,45 @@ class Interface(QtCore.QObject):
             x = self.draw_text(painter, x, y, padding, True, '%s x %d' % (form, counts[i]))
 
     def paint_grid(self, painter):
-        self.setPaintColors(painter, tweak_color_value(self.background), None)
-        f = 4.0 / len(self.config.connections)
-        for (y,x) in self.assembler.point_set:
-            poly = [ ]
+        self.setPaintColors(painter, self.grid_color, None)
+        if self.grid_polys is None:
+            # The grid only moves on reset or resize, so tessellate the
+            # cells once and replay the cached polygons on later repaints.
+            f = 4.0 / len(self.config.connections)
+            corners = [ ]
             for i in range(len(self.config.connections)):
                 a = self.config.connections[i-1]
                 b = self.config.connections[i]
-                poly.append((self.pos(x*2+(a[0]+b[0])*f,y*2+(a[1]+b[1])*f)).int_xy())
-
-            painter.drawPolygon(*val2pt(poly))
+                corners.append(((a[0]+b[0])*f, (a[1]+b[1])*f))
+            pos = self.pos
+            self.grid_polys = [
+                val2poly([ pos(x*2+cx, y*2+cy).int_xy() for cx, cy in corners ])
+                for y, x in map(unpack_point, self.assembler.point_set) ]
+        # Grid cells are convex by construction, so skip the winding-rule
+        # work drawPolygon would do.
+        for poly in self.grid_polys:
+            painter.drawConvexPolygon(poly)
 
     def paint_tiles(self, painter):
         # Note: we do the drawing in two passes to that octogonal tilings overlap more gracefully.
-        for (y,x), form_number in self.assembler.tiles.items():
+        draw_poly = self.draw_poly
+        unpack = unpack_point
+        even = [ ]
+        odd = [ ]
+        for pt, form_number in self.assembler.tiles.items():
+            y, x = unpack(pt)
             if y % 2 == x % 2:
-                self.draw_poly(y,x,form_number,painter)
-        for (y,x), form_number in self.assembler.tiles.items():
-            if y % 2 != x % 2:
-                self.draw_poly(y,x,form_number,painter)
+                even.append((form_number, y, x))
+            else:
+                odd.append((form_number, y, x))
+        # Tiles within a pass never overlap, so draw them grouped by form
+        # to keep hitting the same sprite.
+        even.sort()
+        odd.sort()
+        for form_number, y, x in even:
+            draw_poly(y,x,form_number,painter)
+        for form_number, y, x in odd:
+            draw_poly(y,x,form_number,painter)
 
     def paint_error(self, painter):
         self.setPaintColors(painter, QtGui.QColor(0,0,0), QtGui.QColor(240,200,200))
@@ -1670,34 +1914,61 @@ class Interface(QtCore.QObject):
 
     def repaint_all(self, painter):
         self.full_paint = False
-        self.setPaintColors(painter, None, self.background)
-        painter.drawRect(0, 0, self.canvas_width(), self.canvas_height())
+        # The background and grid are stable between resets and resizes;
+        # keep them as a pixmap layer so toggling tile options does not pay
+        # for re-tessellating the grid.
+        w = self.canvas_width()
+        h = self.canvas_height()
+        key = (w, h, bool(self.grid), self.background.rgba(),
+               max(1, int(self.thickness * self.config.thickness)), self.config)
+        if self.base_key != key:
+            pixmap = QtGui.QPixmap(w, h)
+            base = QtGui.QPainter()
+            base.begin(pixmap)
+            base.setRenderHints(QtGui.QPainter.Antialiasing)
+            self.setPaintColors(base, None, self.background)
+            base.drawRect(0, 0, w, h)
+            if self.grid:
+                self.paint_grid(base)
+            base.end()
+            self.base_pixmap = pixmap
+            self.base_key = key
+        painter.drawPixmap(0, 0, self.base_pixmap)
 
         if self.labels:
             self.paint_labels(painter)
 
-        if self.grid:
-            self.paint_grid(painter)
-
         self.paint_tiles(painter)
 
         if self.error:
             self.paint_error(painter)
 
     def paint_changes(self, painter):
+        changes = self.assembler.changes
+        self.assembler.changes = { }
+
         if self.full_paint:
+            # Everything below gets redrawn anyway.
             self.repaint_all(painter)
+            return
 
-        changes = self.assembler.changes
-        self.assembler.changes = { }
-        for y,x in changes:
-            old = changes[(y,x)]
+        draw_poly = self.draw_poly
+        unpack = unpack_point
+        tiles_get = self.assembler.tiles.get
+        # One pass over the change map: erase immediately, queue the draws
+        # so no erase can clip a freshly drawn neighbour.
+        draws = [ ]
+        for pt, old in changes.items():
+            new = tiles_get(pt,None)
+            if old == new:
+                continue
+            y, x = unpack(pt)
             if old is not None:
-                self.draw_poly(y,x,old, painter, True)
-        for y,x in changes:
-            new = self.assembler.tiles.get((y,x),None)
+                draw_poly(y,x,old, painter, True)
             if new is not None:
-                self.draw_poly(y,x,new, painter, False)
+                draws.append((y, x, new))
+        for y, x, new in draws:
+            draw_poly(y,x,new, painter, False)
 
 
 # ========================================================================
@@ -1709,7 +1980,7 @@ def seeders(n, seeds, max_connections):
     seed = seeds[0]
     other_seeds = seeds[1:]
     base = len(seed)
-    done = { }
+    done = set()
     for i in range(1, base ** n):
         grown = ""
         for j in range(n):
@@ -1725,7 +1996,7 @@ def seeders(n, seeds, max_connections):
                 swap_result = (t.swapcase() for t in result)
                 if result in done or swap_result in done:
                     continue
-                done[result] = True
+                done.add(result)
                 yield result
         else:
             yield (grown,)
@@ -1772,10 +2043,11 @@ if __name__ == '__main__':
         ui.tilings_combo.setCurrentText("%s w=%d h=%d" % (diagram, opts.width, opts.height))
         ui.reset()
 
-        iterations = opts.max_iterations
-        while ui.timer and iterations > 0:
+        # Ticks now run many solver iterations each, so bound on the
+        # assembler iteration count the flag documents, not on ticks.
+        max_iteration = ui.iteration + opts.max_iterations
+        while ui.timer and ui.iteration < max_iteration:
             app.processEvents()
-            iterations -= 1
 
         if ui.assembler.dirty:
             if opts.verbose: